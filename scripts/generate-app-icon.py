@@ -3,42 +3,77 @@
 EduDashPro App Icon Generator
 Creates custom app icons with educational theme
 """
+import argparse
 import os
-from PIL import Image, ImageDraw, ImageFont
+from functools import lru_cache
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw, ImageFont
 import requests
 from io import BytesIO
+from icon_common import (
+    ASSETS, ICON_CACHE_VERSION, file_hash, is_cached, load_icon_cache, save_icon_cache, save_pngs,
+)
+
+# Every icon written by save_app_icons: (label, output path, size)
+APP_ICONS = [
+    # Standard app icon (1024x1024)
+    ('app icon', ASSETS / 'icon.png', 1024),
+    # Adaptive icon (1024x1024 - Android)
+    ('adaptive icon', ASSETS / 'adaptive-icon.png', 1024),
+    # Splash screen icon (same as app icon for consistency)
+    ('splash icon', ASSETS / 'splash-icon.png', 1024),
+    # Notification icon (should be white/transparent, smaller)
+    ('notification icon', ASSETS / 'notification-icon.png', 256),
+    # Favicon for web (smaller size)
+    ('favicon', ASSETS / 'favicon.png', 32),
+]
+
+# Bold TrueType fonts to try, by file name: Pillow searches the platform's
+# font directories for each (DejaVu on Linux, Arial Bold on macOS/Windows)
+FONT_CANDIDATES = ('DejaVuSans-Bold.ttf', 'Arial Bold.ttf', 'arialbd.ttf')
+
+@lru_cache(maxsize=None)
+def load_font(size):
+    """Load the first available bold font at the given size"""
+    for name in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            pass
+    # Pillow's built-in font still honours the requested size (Pillow >= 10.1)
+    return ImageFont.load_default(size=size)
 
 def create_educational_icon():
     """Create a custom educational app icon"""
     
     # Create a 1024x1024 canvas (required size for app icons)
     size = 1024
-    img = Image.new('RGB', (size, size), color='#00f5ff')  # EduDashPro brand color
-    draw = ImageDraw.Draw(img)
     
-    # Create a gradient background
-    for y in range(size):
-        # Gradient from brand blue to darker blue
-        r = int(0 + (10 * y / size))
-        g = int(245 - (50 * y / size))
-        b = int(255 - (100 * y / size))
-        color = (r, g, b)
-        draw.line([(0, y), (size, y)], fill=color)
+    # Create a gradient background from brand blue (#00f5ff) to darker blue by
+    # blending the two endpoint colours through Pillow's C-level linear ramp
+    # (pillow-simd speeds up the resize/composite kernels further)
+    ramp = Image.linear_gradient('L').resize((1, size), Image.Resampling.BILINEAR)
+    ramp = ramp.resize((size, size), Image.Resampling.NEAREST)
+    top_color = Image.new('RGB', (size, size), (0, 245, 255))
+    bottom_color = Image.new('RGB', (size, size), (10, 195, 155))
+    pixels = np.asarray(Image.composite(bottom_color, top_color, ramp), dtype=np.float32)
     
     # Add a subtle rounded rectangle overlay
     margin = size // 8
-    overlay = Image.new('RGBA', (size, size), (255, 255, 255, 0))
-    overlay_draw = ImageDraw.Draw(overlay)
     
-    # Draw main icon shape (rounded rectangle)
+    # Draw main icon shape (rounded rectangle) as a coverage mask
     corner_radius = size // 6
     rect_coords = [margin, margin, size - margin, size - margin]
+    overlay_mask = Image.new('L', (size, size), 0)
+    ImageDraw.Draw(overlay_mask).rounded_rectangle(rect_coords, radius=corner_radius, fill=40)
     
-    # Create rounded rectangle manually (PIL doesn't have native rounded rectangles in all versions)
-    overlay_draw.rounded_rectangle(rect_coords, radius=corner_radius, fill=(255, 255, 255, 40))
+    # Blend translucent white into the gradient, touching only the masked region
+    top, bottom = margin, size - margin + 1
+    alpha = np.asarray(overlay_mask, dtype=np.float32)[top:bottom, top:bottom, None] / 255
+    region = pixels[top:bottom, top:bottom]
+    region += (255 - region) * alpha
     
-    # Composite the overlay
-    img = Image.alpha_composite(img.convert('RGBA'), overlay).convert('RGB')
+    img = Image.fromarray((pixels + 0.5).astype(np.uint8))
     draw = ImageDraw.Draw(img)
     
     # Add educational elements
@@ -70,77 +105,91 @@ def create_educational_icon():
     line_left = book_left + book_width // 6
     line_right = book_left + book_width - book_width // 6
     
-    for i in range(3):
-        y = line_y_start + (i * line_spacing)
-        width = 3 if i == 0 else 2
-        draw.rectangle([line_left, y, line_right - (i * 20), y + width], fill=line_color)
+    # Rasterize the lines into one overlay with slice writes and paste it in
+    # a single call (rectangle coordinates are inclusive); the overlay is
+    # sized from the line list so adding lines needs no other change
+    line_widths = [3, 2, 2]  # Line thickness, first line bolder
+    lines_height = max(i * line_spacing + width + 1 for i, width in enumerate(line_widths))
+    lines = np.zeros((lines_height, line_right - line_left + 1, 4), dtype=np.uint8)
+    for i, width in enumerate(line_widths):
+        y = i * line_spacing
+        lines[y:y + width + 1, :line_right - (i * 20) - line_left + 1] = (*ImageColor.getrgb(line_color), 255)
+    img.paste(Image.fromarray(lines[..., :3]), (line_left, line_y_start), Image.fromarray(lines[..., 3]))
     
     # Add AI/dashboard elements (small dots/indicators)
     dot_size = 12
     dot_y = center_y + book_height // 2 + size // 10
     
-    # Three dots representing AI intelligence
-    for i in range(3):
-        dot_x = center_x - 30 + (i * 30)
-        color = ['#ff6b6b', '#4ecdc4', '#45b7d1'][i]  # Different colors for each dot
-        draw.ellipse([dot_x - dot_size//2, dot_y - dot_size//2, 
-                     dot_x + dot_size//2, dot_y + dot_size//2], fill=color)
+    # Three dots representing AI intelligence, rasterized into one strip
+    # and pasted in a single call
+    dot_colors = ['#ff6b6b', '#4ecdc4', '#45b7d1']  # Different colors for each dot
+    dot_spacing = 30
+    dot_radius = dot_size // 2
+    strip_height = dot_size + 1
+    strip_width = dot_spacing * (len(dot_colors) - 1) + strip_height
+    strip = np.zeros((strip_height, strip_width, 4), dtype=np.uint8)
+    yy, xx = np.ogrid[:strip_height, :strip_width]
+    for i, color in enumerate(dot_colors):
+        dot_x = dot_radius + i * dot_spacing
+        # Include pixel centres within half a pixel of the circle edge
+        inside = (xx - dot_x) ** 2 + (yy - dot_radius) ** 2 <= dot_radius * (dot_radius + 1)
+        strip[inside] = (*ImageColor.getrgb(color), 255)
+    img.paste(
+        Image.fromarray(strip[..., :3]),
+        (center_x - dot_spacing - dot_radius, dot_y - dot_radius),
+        Image.fromarray(strip[..., 3]),
+    )
     
     # Add subtle "Pro" indicator
-    try:
-        # Try to use a system font
-        font_size = size // 20
-        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", font_size)
-    except:
-        font = ImageFont.load_default()
-    
-    # Add "EDU" text at the bottom
+    font_size = size // 20
+    font = load_font(font_size)
+    
+    # Add "EDU" text at the bottom, horizontally centred on its ascender line
     text = "EDU"
-    text_bbox = draw.textbbox((0, 0), text, font=font)
-    text_width = text_bbox[2] - text_bbox[0]
-    text_height = text_bbox[3] - text_bbox[1]
-    text_x = center_x - text_width // 2
     text_y = center_y + book_height // 2 + size // 6
     
-    # Add text shadow
-    draw.text((text_x + 2, text_y + 2), text, fill='rgba(0,0,0,100)', font=font)
-    draw.text((text_x, text_y), text, fill='white', font=font)
+    # White text with a translucent dark outline, rendered in one pass; the
+    # RGBA draw mode blends the outline's alpha into the RGB image
+    ImageDraw.Draw(img, 'RGBA').text(
+        (center_x, text_y), text, fill='white', font=font,
+        stroke_width=2, stroke_fill=(0, 0, 0, 180), anchor='ma'
+    )
     
     return img
 
-def save_app_icons(base_image):
-    """Save app icons in different sizes"""
-    assets_dir = os.path.join(os.getcwd(), 'assets')
-    
-    # Create assets directory if it doesn't exist
-    os.makedirs(assets_dir, exist_ok=True)
-    
-    # Standard app icon (1024x1024)
-    icon_path = os.path.join(assets_dir, 'icon.png')
-    base_image.save(icon_path, 'PNG', quality=100)
-    print(f"✅ Created app icon: {icon_path}")
-    
-    # Adaptive icon (1024x1024 - Android)
-    adaptive_icon_path = os.path.join(assets_dir, 'adaptive-icon.png')
-    base_image.save(adaptive_icon_path, 'PNG', quality=100)
-    print(f"✅ Created adaptive icon: {adaptive_icon_path}")
-    
-    # Splash screen icon (same as app icon for consistency)
-    splash_icon_path = os.path.join(assets_dir, 'splash-icon.png')
-    base_image.save(splash_icon_path, 'PNG', quality=100)
-    print(f"✅ Created splash icon: {splash_icon_path}")
-    
-    # Notification icon (should be white/transparent, smaller)
-    notification_icon = create_notification_icon()
-    notification_icon_path = os.path.join(assets_dir, 'notification-icon.png')
-    notification_icon.save(notification_icon_path, 'PNG', quality=100)
-    print(f"✅ Created notification icon: {notification_icon_path}")
-    
-    # Favicon for web (smaller size)
-    favicon = base_image.resize((32, 32), Image.Resampling.LANCZOS)
-    favicon_path = os.path.join(assets_dir, 'favicon.png')
-    favicon.save(favicon_path, 'PNG', quality=100)
-    print(f"✅ Created favicon: {favicon_path}")
+def save_app_icons(force=False):
+    """Render and save app icons in different sizes (force re-encodes even unchanged icons)"""
+    # Icons are drawn procedurally, so this script is their source; check the
+    # cache before drawing anything so a fully cached run renders nothing
+    source_hash = file_hash(__file__)
+    cache = load_icon_cache()
+    stale_icons = []
+    for label, path, size in APP_ICONS:
+        if not force and is_cached(cache, path, source_hash, size):
+            print(f"⏭️  Skipped {label} (unchanged): {path}")
+        else:
+            stale_icons.append((label, path, size))
+    
+    # One image per size, rendered on first use: the 1024 icons share one
+    # image, so save_pngs encodes it once; the favicon box-reduces
+    # 1024 -> 64, then LANCZOS to 32
+    images = {}
+    def image_for(size):
+        if size not in images:
+            if size == 1024:
+                images[size] = create_educational_icon()
+            elif size == 256:
+                images[size] = create_notification_icon()
+            else:
+                images[size] = image_for(1024).reduce(16).resize((size, size), Image.Resampling.LANCZOS)
+        return images[size]
+    
+    save_pngs([(image_for(size), path) for _, path, size in stale_icons])
+    
+    for label, path, size in stale_icons:
+        cache[os.path.basename(path)] = [source_hash, size, ICON_CACHE_VERSION]
+        print(f"✅ Created {label}: {path}")
+    save_icon_cache(cache)
 
 def create_notification_icon():
     """Create a notification icon (should be white/transparent)"""
@@ -171,13 +220,20 @@ def create_notification_icon():
     return img
 
 if __name__ == "__main__":
-    print("🎨 Generating custom EduDashPro app icons...")
+    parser = argparse.ArgumentParser(description="Generate the EduDashPro app icons into assets/")
+    parser.add_argument('--force', '--regenerate', action='store_true',
+                        help="regenerate icons even if they already exist")
+    args = parser.parse_args()
+    
+    # The generated icons are committed, so there is normally nothing to do
+    if not args.force and all(path.exists() for _, path, _ in APP_ICONS):
+        print("✅ App icons already exist in assets/ (use --force to regenerate)")
+        raise SystemExit(0)
     
-    # Create the main icon
-    icon = create_educational_icon()
+    print("🎨 Generating custom EduDashPro app icons...")
     
-    # Save all required icon sizes
-    save_app_icons(icon)
+    # Create and save all required icon sizes
+    save_app_icons(force=args.force)
     
     print("\n🎉 Custom app icons generated successfully!")
     print("📱 Your app will now use a professional educational-themed icon")
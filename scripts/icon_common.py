@@ -0,0 +1,84 @@
+"""
+Shared helpers for the EduDashPro icon scripts (generate-app-icon.py and
+make-round-icon.py): output location, PNG encoding and the icon cache
+"""
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+# zlib level for PNG output: 1 is fast for local iteration, use 9 for release assets
+ICON_COMPRESS_LEVEL = int(os.environ.get('ICON_COMPRESS_LEVEL', '1'))
+
+# Generated icons live in the app's assets directory, wherever the script is run from
+ASSETS = Path(__file__).resolve().parent.parent / 'assets'
+ASSETS.mkdir(parents=True, exist_ok=True)
+
+# Bump to invalidate every cached icon after changing how icons are rendered
+ICON_CACHE_VERSION = 1
+ICON_CACHE_FILE = '.icon-cache.json'
+
+def file_hash(path):
+    """Return a content hash of a file (cache key only, not for security)"""
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+def load_icon_cache():
+    """Load the {filename: [source_hash, size, version]} cache, or an empty one"""
+    try:
+        with open(ASSETS / ICON_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_icon_cache(cache):
+    """Atomically write the icon cache next to the generated assets"""
+    cache_path = ASSETS / ICON_CACHE_FILE
+    tmp_path = ASSETS / (ICON_CACHE_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+def is_cached(cache, output_path, source_hash, size):
+    """True if output_path exists and was last written from the same inputs"""
+    entry = [source_hash, size, ICON_CACHE_VERSION]
+    return os.path.exists(output_path) and cache.get(os.path.basename(output_path)) == entry
+
+def save_png(image, output_path):
+    """Encode an image as PNG at ICON_COMPRESS_LEVEL"""
+    # Write beside the target and swap it in, so an existing hardlink to the
+    # old file is replaced rather than overwritten in place
+    tmp_path = f'{output_path}.tmp'
+    image.save(tmp_path, 'PNG', compress_level=ICON_COMPRESS_LEVEL)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+def link_or_copy(source_path, output_path):
+    """Make output_path a hardlink to source_path, copying where links are unsupported"""
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    try:
+        os.link(source_path, output_path)
+    except OSError:
+        shutil.copyfile(source_path, output_path)
+
+def save_pngs(images):
+    """Encode (image, output_path) pairs as PNGs"""
+    # The same image object listed under several paths is encoded once and
+    # linked to the remaining paths. Encoding is serial: after that dedup a
+    # run has at most one large image, and a process pool's startup (spawn
+    # on macOS/Windows re-imports numpy and PIL) costs more than it saves
+    unique = {}
+    duplicates = []
+    for image, output_path in images:
+        if id(image) in unique:
+            duplicates.append((unique[id(image)][1], output_path))
+        else:
+            unique[id(image)] = (image, output_path)
+
+    saved = [save_png(image, output_path) for image, output_path in unique.values()]
+
+    for source_path, output_path in duplicates:
+        link_or_copy(source_path, output_path)
+    return saved + [output_path for _, output_path in duplicates]
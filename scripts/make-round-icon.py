@@ -2,82 +2,131 @@
 """
 Make EduDashPro app icon round with proper masking
 """
-from PIL import Image, ImageDraw
+import argparse
+from functools import lru_cache
+import numpy as np
+from PIL import Image
 import os
+from icon_common import (
+    ASSETS, ICON_CACHE_VERSION, file_hash, is_cached, load_icon_cache, save_icon_cache, save_png, save_pngs,
+)
 
+# Round versions for all required sizes
+ROUND_ICONS = [
+    (ASSETS / 'icon.png', 1024),
+    (ASSETS / 'adaptive-icon.png', 1024),
+    (ASSETS / 'splash-icon.png', 1024),
+    (ASSETS / 'favicon.png', 32),
+    (ASSETS / 'favicon-16x16.png', 16),
+    (ASSETS / 'favicon-32x32.png', 32),
+    (ASSETS / 'favicon-48x48.png', 48),
+    (ASSETS / 'favicon-64x64.png', 64),
+]
+NOTIFICATION_ICON = ASSETS / 'notification-icon.png'
+
+def circle_alpha(size, margin=0):
+    """Return a (size, size) uint8 alpha array of a centred, antialiased circle"""
+    center = size / 2
+    radius = center - margin
+    y, x = np.ogrid[:size, :size]
+    # Distance from each pixel centre to the circle centre, turned into
+    # a one-pixel-wide coverage ramp across the edge
+    distance = np.sqrt((x + 0.5 - center) ** 2 + (y + 0.5 - center) ** 2)
+    coverage = np.clip(radius - distance + 0.5, 0, 1)
+    return (coverage * 255 + 0.5).astype(np.uint8)
+
+@lru_cache(maxsize=16)
 def create_round_mask(size):
-    """Create a circular mask"""
-    mask = Image.new('L', (size, size), 0)
-    draw = ImageDraw.Draw(mask)
-    draw.ellipse((0, 0, size, size), fill=255)
-    return mask
+    """Create a circular mask with an antialiased edge"""
+    return Image.fromarray(circle_alpha(size))
 
-def make_icon_round(input_path, output_path, size=1024):
-    """Make an icon perfectly round"""
-    # Open the original icon
-    icon = Image.open(input_path)
+def make_icon_round(icon, size=1024):
+    """Make an already-decoded icon perfectly round"""
+    round_icon = icon
     
     # Resize to target size if needed
-    if icon.size != (size, size):
-        icon = icon.resize((size, size), Image.Resampling.LANCZOS)
+    if round_icon.size != (size, size):
+        round_icon = round_icon.resize((size, size), Image.Resampling.LANCZOS)
     
     # Convert to RGBA if not already
-    if icon.mode != 'RGBA':
-        icon = icon.convert('RGBA')
-    
-    # Create circular mask
-    mask = create_round_mask(size)
+    if round_icon.mode != 'RGBA':
+        round_icon = round_icon.convert('RGBA')
     
-    # Apply mask to make it round
-    round_icon = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-    round_icon.paste(icon, (0, 0))
-    round_icon.putalpha(mask)
+    # putalpha works in place, so never touch the caller's image
+    if round_icon is icon:
+        round_icon = icon.copy()
     
-    # Save the round icon
-    round_icon.save(output_path, 'PNG', quality=100)
-    print(f"✅ Created round icon: {output_path}")
+    # Apply circular mask to make it round
+    round_icon.putalpha(create_round_mask(size))
     
     return round_icon
 
-def create_all_round_icons():
-    """Create all app icons as round versions"""
+def create_all_round_icons(force=False):
+    """Create all app icons as round versions (force re-encodes even unchanged icons)"""
     base_icon_path = '/home/king/Downloads/edp.png'
     
     if not os.path.exists(base_icon_path):
         print("❌ Original icon not found at /home/king/Downloads/edp.png")
         return
     
-    # Create round versions for all required sizes
-    icons_to_create = [
-        ('assets/icon.png', 1024),
-        ('assets/adaptive-icon.png', 1024),
-        ('assets/splash-icon.png', 1024),
-        ('assets/favicon.png', 32),
-        ('assets/favicon-16x16.png', 16),
-        ('assets/favicon-32x32.png', 32),
-        ('assets/favicon-48x48.png', 48),
-        ('assets/favicon-64x64.png', 64),
-    ]
-    
-    for output_path, size in icons_to_create:
-        make_icon_round(base_icon_path, output_path, size)
+    # Skip outputs already generated from this exact source image
+    source_hash = file_hash(base_icon_path)
+    cache = load_icon_cache()
+    stale_icons = []
+    for output_path, size in ROUND_ICONS:
+        if not force and is_cached(cache, output_path, source_hash, size):
+            print(f"⏭️  Skipped round icon (unchanged): {output_path}")
+        else:
+            stale_icons.append((output_path, size))
+    
+    if stale_icons:
+        # Decode the original once and mask it at full size; smaller icons are
+        # downscaled from this round master instead of being re-masked
+        icon = Image.open(base_icon_path).convert('RGBA')
+        master = make_icon_round(icon, 1024)
+        
+        # Favicon sizes start from a cheap integer box-reduce of the master
+        # (1024 -> 64) and only run LANCZOS over the small image
+        reduced = master.reduce(1024 // 64)
+        
+        # One image per size, so equal sizes (favicon.png and
+        # favicon-32x32.png) share an object that save_pngs encodes once
+        images = {1024: master, 64: reduced}
+        for _, size in stale_icons:
+            if size not in images:
+                source = reduced if size < 64 else master
+                images[size] = source.resize((size, size), Image.Resampling.LANCZOS)
+        
+        save_pngs([(images[size], output_path) for output_path, size in stale_icons])
+        
+        for output_path, size in stale_icons:
+            cache[os.path.basename(output_path)] = [source_hash, size, ICON_CACHE_VERSION]
+            print(f"✅ Created round icon: {output_path}")
     
     # Create a special notification icon (should be simpler and white/transparent)
-    create_round_notification_icon()
+    create_round_notification_icon(cache, force)
+    save_icon_cache(cache)
 
-def create_round_notification_icon():
+def create_round_notification_icon(cache, force=False):
     """Create a simple round notification icon"""
     size = 256
+    output_path = NOTIFICATION_ICON
     
-    # Create transparent background
-    notification_icon = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(notification_icon)
+    # The icon is drawn procedurally, so this script is its source
+    source_hash = file_hash(__file__)
+    if not force and is_cached(cache, output_path, source_hash, size):
+        print(f"⏭️  Skipped round notification icon (unchanged): {output_path}")
+        return
+    
+    # Compose the whole icon in one RGBA array, starting fully transparent
+    pixels = np.zeros((size, size, 4), dtype=np.uint8)
     
     # Create a simple round white circle with a smaller inner circle
     margin = size // 6
     
-    # Outer circle (white)
-    draw.ellipse([margin, margin, size - margin, size - margin], fill='white')
+    # Outer circle (white), with its antialiased coverage as alpha
+    pixels[..., :3] = 255
+    pixels[..., 3] = circle_alpha(size, margin)
     
     # Inner design - simple chart bars in the center
     center_x, center_y = size // 2, size // 2
@@ -91,18 +140,29 @@ def create_round_notification_icon():
         (center_x + bar_spacing, center_y - size // 10, bar_width, size // 5),  # Tall bar
     ]
     
+    # Bars sit well inside the circle; bounds are inclusive like draw.rectangle
     for x, y, width, height in bars:
-        draw.rectangle([x, y, x + width, y + height], fill='#00f5ff')
+        pixels[y:y + height + 1, x:x + width + 1] = (0x00, 0xf5, 0xff, 255)
     
-    # Make it round
-    mask = create_round_mask(size)
-    notification_icon.putalpha(mask)
+    notification_icon = Image.fromarray(pixels)
     
-    notification_icon.save('assets/notification-icon.png', 'PNG', quality=100)
-    print("✅ Created round notification icon: assets/notification-icon.png")
+    save_png(notification_icon, output_path)
+    cache[os.path.basename(output_path)] = [source_hash, size, ICON_CACHE_VERSION]
+    print(f"✅ Created round notification icon: {output_path}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Make the EduDashPro app icons round")
+    parser.add_argument('--force', '--regenerate', action='store_true',
+                        help="regenerate icons even if they already exist")
+    args = parser.parse_args()
+    
+    # The generated icons are committed, so there is normally nothing to do
+    outputs = [path for path, _ in ROUND_ICONS] + [NOTIFICATION_ICON]
+    if not args.force and all(path.exists() for path in outputs):
+        print("✅ Round icons already exist in assets/ (use --force to regenerate)")
+        raise SystemExit(0)
+    
     print("🔄 Making EduDashPro icons round...")
-    create_all_round_icons()
+    create_all_round_icons(force=args.force)
     print("\n🎉 All icons are now perfectly round!")
     print("🔄 The new round icons will appear after you refresh your browser/app")
\ No newline at end of file